@@ -14,18 +14,21 @@ pool = project.GetMediaPool()
 folder = pool.GetCurrentFolder()
 
 for clip in folder.GetClipList():
-    name = os.path.splitext(clip.GetClipProperty("Clip Name"))[0]
-    start = clip.GetClipProperty("Start TC")
-    fps = clip.GetClipProperty("FPS")
-    resolution = clip.GetClipProperty("Resolution")
-    width, height = resolution.split("x")
-    drop_frame = clip.GetClipProperty("Drop frame")
+    # Calling GetClipProperty without a name returns every property at once.
+    properties = clip.GetClipProperty()
+    name = os.path.splitext(properties["Clip Name"])[0]
+    start = properties["Start TC"]
+    width, height = properties["Resolution"].split("x")
+    settings = {
+        "useCustomSettings": "1",
+        "timelineFrameRate": properties["FPS"],
+        "timelineDropFrameTimecode": properties["Drop frame"],
+        "timelineResolutionHeight": height,
+        "timelineResolutionWidth": width,
+    }
     timeline = pool.CreateEmptyTimeline(name)
-    timeline.SetSetting("useCustomSettings", "1")
-    timeline.SetSetting("timelineFrameRate", fps)
-    timeline.SetSetting("timelineDropFrameTimecode", drop_frame)
-    timeline.SetSetting("timelineResolutionHeight", height)
-    timeline.SetSetting("timelineResolutionWidth", width)
+    for setting, value in settings.items():
+        timeline.SetSetting(setting, value)
     timeline.SetStartTimecode(start)
     pool.AppendToTimeline(clip)
     timeline.AddTrack("subtitle")
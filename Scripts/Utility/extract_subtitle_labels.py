@@ -6,37 +6,62 @@ Creates a labeling csv from the subtitle track.
 """
 
 import csv
-import os
+import io
+from pathlib import Path
 
 # Set the CSV directory here.
 dirpath = ""
-os.makedirs(dirpath, exist_ok=True)
+out_dir = Path(dirpath)
+out_dir.mkdir(parents=True, exist_ok=True)
 # If multiple subtitle tracks, change to the one containing the labels.
 subtitle_track = 1
 
+
+def escape_field(field):
+    """Quotes a text field the same way csv.writer does by default."""
+    if any(char in field for char in ',"\r\n'):
+        return '"' + field.replace('"', '""') + '"'
+    return field
+
+
 manager = resolve.GetProjectManager()
 project = manager.GetCurrentProject()
 timeline = project.GetCurrentTimeline()
-clipname = timeline.GetItemListInTrack("video", 1)[0].GetName()
+video_items = timeline.GetItemListInTrack("video", 1)
+if not video_items:
+    raise RuntimeError("No video clip found on track V1.")
+clipname = video_items[0].GetName()
 offset = timeline.GetStartFrame()
 
-filepath = os.path.join(dirpath, os.path.splitext(clipname)[0] + ".csv")
+filepath = out_dir / (Path(clipname).stem + ".csv")
 
 width = timeline.GetSetting("timelineResolutionWidth")
 height = timeline.GetSetting("timelineResolutionHeight")
 aspect = int(width) / int(height)
 
+# Gather the subtitle data in one pass so the csv is built from plain tuples.
+subtitles = [
+    (item.GetName(), item.GetStart() - offset, item.GetEnd() - offset)
+    for item in timeline.GetItemListInTrack("subtitle", subtitle_track)
+]
+
+# Stage the csv in memory so it reaches the file in a single write.
+buffer = io.StringIO(newline="")
+writer = csv.writer(buffer)
+
+# The column names in order
+header = ["file", "label", "start", "end", "duration", "aspect_ratio"]
+writer.writerow(header)
+
+# The file and aspect ratio columns are the same on every row, so they are
+# formatted once and only the label needs escaping per row.
+prefix = escape_field(clipname) + ","
+suffix = f",{aspect}{writer.dialect.lineterminator}"
+buffer.writelines(
+    f"{prefix}{escape_field(name)},{start},{end},{end - start}{suffix}"
+    for name, start, end in subtitles
+)
+
 # Open the output file
-with open(filepath, "w", newline="") as file:
-    writer = csv.writer(file)
-
-    # The column names in order
-    header = ["file", "label", "start", "end", "duration", "aspect_ratio"]
-    writer.writerow(header)
-
-    for subtitle in timeline.GetItemListInTrack("subtitle", subtitle_track):
-        name = subtitle.GetName()
-        start = subtitle.GetStart() - offset
-        end = subtitle.GetEnd() - offset
-        duration = end - start
-        writer.writerow([clipname, name, start, end, duration, aspect])
+with filepath.open("w", newline="") as file:
+    file.write(buffer.getvalue())
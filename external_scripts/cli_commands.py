@@ -1,6 +1,7 @@
 """Module that adds cli options to the current external_scripts."""
 
 import argparse
+import os
 
 from .extract_subtitle_labels.ffmpeg_export import FfmpegCsvExporter
 
@@ -14,14 +15,20 @@ def extract_csv_stills(args):
     ffmpeg = FfmpegCsvExporter(args.csvs,
                                args.media,
                                args.output,
+                               jobs=args.jobs,
                                verbose=args.verbose,
                                log_filepath=args.log)
     ffmpeg.extract_frames()
 
 
-def connect_cli():
-    """Gathers individual scripts and enables cli interaction"""
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive integer.")
+    return number
+
 
+def _build_parser():
     parser = argparse.ArgumentParser(
         prog="External Scripts",
         description="Additional utilities to be run outside of Resolve.",
@@ -63,13 +70,28 @@ def connect_cli():
         metavar='PATH',
         default="./extract_subtitles_labels.log",
         type=str)
+    extract_stills.add_argument(
+        "--jobs",
+        "-j",
+        help="The number of csvs to process in parallel. Will default to the "
+             "number of available cpus if not specified.",
+        metavar='N',
+        default=os.cpu_count(),
+        type=_positive_int)
     extract_stills.add_argument(
         "--verbose",
         "-v",
         help="Increases verbosity of shell messages.",
         action='store_true')
+    return parser
+
 
-    args = parser.parse_args()
+_PARSER = _build_parser()
+
+
+def connect_cli():
+    """Gathers individual scripts and enables cli interaction"""
+    args = _PARSER.parse_args()
 
     if args.script == "extract_stills":
         extract_csv_stills(args)
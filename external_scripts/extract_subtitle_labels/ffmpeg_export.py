@@ -1,10 +1,14 @@
 """A module that uses ffmpeg to extract stills based on the csvs generated
 by the Resolve script create_subtitle_label_seq_from_clip.py"""
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from csv import DictReader
+import functools
 import glob
 import os
 import subprocess
+import tempfile
 from typing import Optional
 
 from ..message_handling import MessageHandlingObject
@@ -21,11 +25,15 @@ class FfmpegCsvExporter(MessageHandlingObject):
         output_directory (Optional[str], optional): The directory where the
             files should be saved. If unspecified, it will output to the media
             directory (with a subfolder for every clip). Defaults to None.
+        jobs (Optional[int], optional): The maximum number of csvs to process
+            concurrently, each in its own ffmpeg process. If None it will use
+            the number of available cpus. Defaults to None.
     """
     def __init__(self,
                  csv_directory: str,
                  media_directory: str,
                  output_directory: Optional[str] = None,
+                 jobs: Optional[int] = None,
                  **kwargs
                  ) -> None:
         if kwargs.get("shared_logger", None) is None:
@@ -36,7 +44,11 @@ class FfmpegCsvExporter(MessageHandlingObject):
         self._output_dir = output_directory or media_directory
         self.frame_digits = 8
         self.ffmpeg_out_suffix = f"%0{self.frame_digits}d"
-        self._output_placeholder = None
+        self.max_filter_arg_length = 4096
+        if jobs is not None and jobs < 1:
+            self._raise(ValueError("Number of jobs must be at least 1."))
+        self._jobs = jobs or os.cpu_count() or 1
+        self._use_threaded_log_locks = self._jobs > 1
 
     def _get_csv_paths(self, csv_directory: str) -> list[str]:
         return sorted(glob.iglob(os.path.join(csv_directory, "*.csv")))
@@ -67,31 +79,35 @@ class FfmpegCsvExporter(MessageHandlingObject):
     def _generate_output_placeholder(self, output_arg):
         old = self.ffmpeg_out_suffix
         new = "{i:0" + str(self.frame_digits) + "d}"
-        self._output_placeholder = output_arg.replace(old, new)
+        return output_arg.replace(old, new)
 
     def _generate_ffmpeg_png_path(self, media_fn):
         directory = os.path.splitext(media_fn)[0]
         fn = f"{directory}_{self.ffmpeg_out_suffix}.png"
         directory = os.path.join(self._output_dir, directory)
         os.makedirs(directory, exist_ok=True)
-        path = os.path.join(directory, fn)
-        self._generate_output_placeholder(path)
-        return path
+        return os.path.join(directory, fn)
+
+    def _generate_select_filter(self, frame_ranges):
+        conditions = "+".join(f"between(n\\,{start}\\,{end-1})"
+                              for (start, end) in frame_ranges)
+        return f"select={conditions}"
 
-    def _generate_ffmpeg_args(self, input_path, media_fn, start, end):
+    def _generate_ffmpeg_args(self, input_path, media_fn, frame_ranges):
         return [
-            "ffmpeg", "-i", input_path, "-start_number", str(start), "-vf",
-            f'select=between(n\\,{start}\\,{end-1}),setpts=PTS-STARTPTS',
+            "ffmpeg", "-nostdin", "-i", input_path, "-start_number", "0",
+            "-vf", self._generate_select_filter(frame_ranges), "-vsync", "0",
             self._generate_ffmpeg_png_path(media_fn)
             ]
 
     def _create_queues_from_csv(self, csv_path):
-        self._print(f"Extracting instructions from {csv_path}")
+        self._print("Extracting instructions from %s", csv_path)
         keys = ["file", "start", "end"]
         last_frame = 0
         error_count = 0
         last_file = None
-        deletion_queue = []
+        last_input_path = None
+        frame_ranges = []
         with open(csv_path, "r") as f:
             reader = DictReader(f)
             for i, row in enumerate(reader):
@@ -104,65 +120,132 @@ class FfmpegCsvExporter(MessageHandlingObject):
                         ValueError,
                         RuntimeError) as e:
                     error_count += 1
-                    self._warn(f"Error {error_count} on csv row {i} "
-                               f"for {csv_path}.")
+                    self._warn("Error %d on csv row %d for %s.",
+                               error_count, i, csv_path)
                     self._warn(e)
                     continue
                 if start < last_frame:
                     self._raise(RuntimeError("Label timecode contains overlap "
                                              f"in row {i}. Make sure csv is "
                                              "consectutive with no overlaps"))
-                if i == error_count:
-                    first_frame = start
-                else:
+                if i != error_count:
                     self._check_input_path(file, last_file)
-                    deletion_queue.append((last_frame, start))
+                # Consecutive labels share a boundary, so extend the previous
+                # range to keep the select filter short.
+                if frame_ranges and start == frame_ranges[-1][1]:
+                    frame_ranges[-1] = (frame_ranges[-1][0], end)
+                else:
+                    frame_ranges.append((start, end))
                 last_frame = end
                 last_file = file
-            try:
-                first_frame
-            except NameError:
-                self._warn(f"{csv_path} contains no valid rows. Skipping to "
-                           "next.")
+                last_input_path = input_path
+            if not frame_ranges:
+                self._warn("%s contains no valid rows. Skipping to next.",
+                           csv_path)
                 return None, []
-            ffmpeg_args = self._generate_ffmpeg_args(input_path,
-                                                     file,
-                                                     first_frame,
-                                                     end)
-            return ffmpeg_args, deletion_queue
-
-    def _clear_existing_frames(self):
-        directory = os.path.dirname(self._output_placeholder)
-        self._print(f"Clearing directory {directory}.")
-        query = os.path.join(directory, "*.png")
-        paths = glob.iglob(query)
-        for path in paths:
+            ffmpeg_args = self._generate_ffmpeg_args(last_input_path,
+                                                     last_file,
+                                                     frame_ranges)
+            return ffmpeg_args, frame_ranges
+
+    def _list_existing_frames(self, output_placeholder):
+        directory = os.path.dirname(output_placeholder)
+        return glob.glob(os.path.join(directory, "*.png"))
+
+    def _clear_existing_frames(self, output_placeholder):
+        directory = os.path.dirname(output_placeholder)
+        self._print("Clearing directory %s.", directory)
+        for path in self._list_existing_frames(output_placeholder):
             os.remove(path)
 
-    def _execute_ffmpeg_command(self, ffmpeg_args):
-        self._print(f'Executing ffmpeg command "{" ".join(ffmpeg_args)}"')
-        ffmpeg = subprocess.Popen(ffmpeg_args)
-        exit_code = ffmpeg.wait()
+    @contextmanager
+    def _move_long_filter_to_script(self, ffmpeg_args):
+        # Very long filters can exceed the command line length limit, so
+        # ffmpeg reads them from a file instead.
+        i = ffmpeg_args.index("-vf")
+        video_filter = ffmpeg_args[i + 1]
+        if len(video_filter) <= self.max_filter_arg_length:
+            yield ffmpeg_args
+            return
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "filter.txt")
+            with open(path, "w") as f:
+                f.write(video_filter)
+            yield [*ffmpeg_args[:i], "-filter_script:v", path,
+                   *ffmpeg_args[i + 2:]]
+
+    def _execute_ffmpeg_command(self, ffmpeg_args, quiet=False):
+        if quiet:
+            # Concurrent ffmpeg processes would interleave their banners and
+            # progress lines on the same terminal, so only show errors.
+            ffmpeg_args = [ffmpeg_args[0], "-loglevel", "error", "-nostats",
+                           *ffmpeg_args[1:]]
+        with self._move_long_filter_to_script(ffmpeg_args) as ffmpeg_args:
+            self._print('Executing ffmpeg command "%s"',
+                        " ".join(ffmpeg_args))
+            ffmpeg = subprocess.Popen(ffmpeg_args)
+            exit_code = ffmpeg.wait()
         if exit_code:
-            self._warn(f"Exit code of {exit_code} ffmpeg command.")
+            self._warn("Exit code of %d ffmpeg command.", exit_code)
+        return exit_code
+
+    def _renumber_frames(self, output_placeholder, frames):
+        self._print("Renumbering extracted frames.")
+        # ffmpeg numbers the selected frames sequentially from 0. Every source
+        # frame number is at least its sequence number, so renaming from the
+        # last frame backwards never overwrites a file still to be renamed.
+        for i, frame in reversed(list(enumerate(frames))):
+            os.replace(output_placeholder.format(i=i),
+                       output_placeholder.format(i=frame))
+
+    def _extract_csv_frames(self, csv_path, ffmpeg_args, frame_ranges,
+                            quiet=False):
+        output_placeholder = self._generate_output_placeholder(ffmpeg_args[-1])
+        frames = [i for (start, end) in frame_ranges
+                  for i in range(start, end)]
+        self._clear_existing_frames(output_placeholder)
+        exit_code = self._execute_ffmpeg_command(ffmpeg_args, quiet)
+        extracted = len(self._list_existing_frames(output_placeholder))
+        # The sequence numbers only map to source frames if every selected
+        # frame was written, so never rename a partial extraction.
+        if exit_code or extracted != len(frames):
+            self._warn("ffmpeg extracted %d of %d frames for %s. Discarding "
+                       "the incomplete output.",
+                       extracted, len(frames), csv_path)
+            self._clear_existing_frames(output_placeholder)
+            return
+        self._renumber_frames(output_placeholder, frames)
 
-    def _clear_unspecified_frames(self, deletion_queue):
-        self._print("Removing unspecified frames.")
-        for (start, end) in deletion_queue:
-            for i in range(start, end):
-                path = self._output_placeholder.format(i=i)
-                os.remove(path)
+    def _extract_queued_frames(self, queues, quiet=False):
+        for queue in queues:
+            self._extract_csv_frames(*queue, quiet=quiet)
+
+    def _group_queues_by_output(self):
+        groups = {}
+        for csv_path in self._csvs:
+            ffmpeg_args, frame_ranges = self._create_queues_from_csv(csv_path)
+            if ffmpeg_args is None:
+                continue
+            directory = os.path.dirname(ffmpeg_args[-1])
+            groups.setdefault(directory, []).append((csv_path,
+                                                     ffmpeg_args,
+                                                     frame_ranges))
+        return list(groups.values())
 
     def extract_frames(self):
         """Creates the still frame datasets from the video clips according
         to the initialization arguments.
         """
-        for csv_path in self._csvs:
-            (ffmpeg_args,
-             deletion_queue) = self._create_queues_from_csv(csv_path)
-            self._clear_existing_frames()
-            self._execute_ffmpeg_command(ffmpeg_args)
-            self._clear_unspecified_frames(deletion_queue)
+        # Csvs sharing an output directory run one after another in the same
+        # job so they never clear each other's frames mid-extraction.
+        groups = self._group_queues_by_output()
+        if self._jobs == 1 or len(groups) < 2:
+            for queues in groups:
+                self._extract_queued_frames(queues)
+            return
+        extract = functools.partial(self._extract_queued_frames, quiet=True)
+        with ThreadPoolExecutor(max_workers=self._jobs) as executor:
+            list(executor.map(extract, groups))
 
 
 def main():
@@ -4,11 +4,27 @@ verbosity."""
 
 import logging
 import functools
+import os
 from typing import Optional
 from threading import Lock
 from warnings import warn
 
 
+_LOGGER_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "critical": logging.CRITICAL,
+    "fatal": logging.CRITICAL,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _get_formatter(logger_format: str) -> logging.Formatter:
+    return logging.Formatter(logger_format)
+
+
 class LoggerGenerator:
     """Custom class to streamline the creation of logging objects.
 
@@ -31,26 +47,28 @@ class LoggerGenerator:
                        ) -> logging.Logger:
         if not logger_name:
             logger_name = "messagehandler"
-        return logging.getLogger(logger_name)
+        logger = logging.getLogger(logger_name)
+        # The file handler is self-contained, so skip the root handlers.
+        logger.propagate = False
+        return logger
 
     def _create_file_handler(self, log_filepath: str) -> logging.FileHandler:
+        # Loggers are global by name, so reuse a handler already writing to
+        # this file rather than attaching a duplicate.
+        path = os.path.abspath(log_filepath)
+        for handler in self._logger.handlers:
+            if (isinstance(handler, logging.FileHandler)
+                    and handler.baseFilename == path):
+                return handler
         return logging.FileHandler(log_filepath)
 
     def _parse_logger_level(self, level_str: Optional[str] = None) -> int:
         if not level_str:
             return logging.INFO
-        level_str = level_str.lower()
-        if level_str == "debug":
-            return logging.DEBUG
-        if level_str == "info":
-            return logging.INFO
-        if level_str == "warning":
-            return logging.WARNING
-        if level_str == "error":
-            return logging.ERROR
-        if (level_str == "critical") or (level_str == "fatal"):
-            return logging.CRITICAL
-        raise ValueError("Invalid option for logger level.")
+        try:
+            return _LOGGER_LEVELS[level_str.lower()]
+        except KeyError:
+            raise ValueError("Invalid option for logger level.") from None
 
     def _set_logger_level(self, level_str: Optional[str] = None) -> None:
         level = self._parse_logger_level(level_str)
@@ -59,8 +77,7 @@ class LoggerGenerator:
 
     def _apply_formatting(self, logger_format: Optional[str] = None) -> None:
         logger_format = logger_format if logger_format else self.default_format
-        formatter = logging.Formatter(logger_format)
-        self._handler.setFormatter(formatter)
+        self._handler.setFormatter(_get_formatter(logger_format))
 
     def generate(self,
                  logger_level: Optional[str] = None,
@@ -81,7 +98,8 @@ class LoggerGenerator:
         """
         self._set_logger_level(logger_level)
         self._apply_formatting(logger_format)
-        self._logger.addHandler(self._handler)
+        if self._handler not in self._logger.handlers:
+            self._logger.addHandler(self._handler)
         return self._logger
 
 
@@ -134,13 +152,10 @@ class MessageHandlingObject:
     def _locked_log_process(func):
         @functools.wraps(func)
         def wrapper(self, *args, **kwargs):
-            locked = self._use_threaded_log_locks
-            if locked:
-                self._log_lock.acquire()
-            output = func(self, *args, **kwargs)
-            if locked:
-                self._log_lock.release()
-            return output
+            if self._use_threaded_log_locks:
+                with self._log_lock:
+                    return func(self, *args, **kwargs)
+            return func(self, *args, **kwargs)
         return wrapper
 
     def _init_logger(self,
@@ -165,18 +180,18 @@ class MessageHandlingObject:
         return shared_logger
 
     @_locked_log_process
-    def _print(self, string, **kwargs):
+    def _print(self, msg, *args, **kwargs):
         if self._verbose:
-            print(string, **kwargs)
+            print(msg % args if args else msg, **kwargs)
         if self._logger is not None:
-            self._logger.info(string)
+            self._logger.info(msg, *args)
 
     @_locked_log_process
-    def _warn(self, string):
+    def _warn(self, msg, *args):
         if not self._suppress_warnings:
-            warn(string)
+            warn(msg % args if args else msg)
         if self._logger is not None:
-            self._logger.warning(string)
+            self._logger.warning(msg, *args)
 
     @_locked_log_process
     def _raise(self, error):